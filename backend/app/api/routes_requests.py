@@ -5,8 +5,9 @@ Endpoints for logging CDN requests to database
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 import logging
 
@@ -29,6 +30,20 @@ class RequestLog(BaseModel):
     experiment_id: Optional[int] = None
 
 
+class RequestLogBatch(BaseModel):
+    records: List[RequestLog]
+
+
+def _parse_request_timestamp(request_timestamp: Optional[str]) -> datetime:
+    """Parse an ISO timestamp sent by an edge, falling back to the current time"""
+    if request_timestamp:
+        try:
+            return datetime.fromisoformat(request_timestamp.replace('Z', '+00:00'))
+        except:
+            pass
+    return datetime.utcnow()
+
+
 @router.post("/requests/log")
 async def log_request(
     request: RequestLog,
@@ -47,13 +62,7 @@ async def log_request(
                 request.experiment_id = active_experiment.experiment_id
         
         # Parse timestamp if provided, otherwise use current time
-        if request.request_timestamp:
-            try:
-                timestamp = datetime.fromisoformat(request.request_timestamp.replace('Z', '+00:00'))
-            except:
-                timestamp = datetime.utcnow()
-        else:
-            timestamp = datetime.utcnow()
+        timestamp = _parse_request_timestamp(request.request_timestamp)
         
         # Insert request into database
         result = db.execute(
@@ -95,6 +104,85 @@ async def log_request(
         raise HTTPException(status_code=500, detail=f"Error logging request: {str(e)}")
 
 
+@router.post("/requests/log_batch")
+async def log_request_batch(
+    batch: RequestLogBatch,
+    db: Session = Depends(get_db)
+):
+    """
+    Log a batch of CDN requests to the database in one statement.
+    Called by the edge simulators' batched metrics flusher.
+    Records without an experiment_id are assigned the active experiment.
+    """
+    if not batch.records:
+        return {"status": "success", "logged": 0, "skipped": 0, "message": "No requests to log"}
+    
+    try:
+        # Look up the active experiment once for the whole batch
+        active_experiment_id = None
+        if any(record.experiment_id is None for record in batch.records):
+            active_experiment = get_active_experiment(db)
+            if active_experiment:
+                active_experiment_id = active_experiment.experiment_id
+        
+        rows = [
+            {
+                "content_id": record.content_id,
+                "edge_id": record.edge_id,
+                "is_cache_hit": record.is_cache_hit,
+                "response_time_ms": record.response_time_ms,
+                "request_timestamp": _parse_request_timestamp(record.request_timestamp),
+                "user_ip": record.user_ip,
+                "user_agent": record.user_agent,
+                "experiment_id": record.experiment_id if record.experiment_id is not None else active_experiment_id
+            }
+            for record in batch.records
+        ]
+        
+        insert_stmt = text("""
+            INSERT INTO requests (
+                content_id, edge_id, is_cache_hit, response_time_ms,
+                request_timestamp, user_ip, user_agent, experiment_id
+            ) VALUES (
+                :content_id, :edge_id, :is_cache_hit, :response_time_ms,
+                :request_timestamp, :user_ip, :user_agent, :experiment_id
+            )
+        """)
+        
+        skipped = 0
+        try:
+            db.execute(insert_stmt, rows)
+            db.commit()
+        except IntegrityError as e:
+            # A bad record (e.g. unknown edge_id/content_id) fails the whole statement;
+            # retry row by row so only the offending records are dropped
+            db.rollback()
+            logger.warning(f"Batch insert failed, retrying {len(rows)} requests individually: {e.orig}")
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert_stmt, row)
+                except IntegrityError:
+                    skipped += 1
+            db.commit()
+            if skipped:
+                logger.warning(f"Skipped {skipped} of {len(rows)} requests violating constraints")
+        
+        logged = len(rows) - skipped
+        logger.debug(f"Logged batch of {logged} requests")
+        
+        return {
+            "status": "success",
+            "logged": logged,
+            "skipped": skipped,
+            "message": "Requests logged successfully"
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error logging request batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Error logging request batch: {str(e)}")
+
+
 @router.get("/requests")
 async def get_requests(
     limit: int = 100,
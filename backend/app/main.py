@@ -2,6 +2,7 @@ from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from prometheus_client import make_asgi_app
 import logging
 
 from app.core.config import settings
@@ -29,6 +30,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus scrape endpoint (decision counters, etc.)
+app.mount("/metrics", make_asgi_app())
+
 
 @app.on_event("startup")
 async def startup_event():
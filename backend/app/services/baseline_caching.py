@@ -2,16 +2,23 @@
 Baseline Caching Service
 Implements LRU/LFU caching strategies when AI is disabled
 """
-import redis
+import functools
+from redis import asyncio as aioredis
 from typing import Dict, List, Optional, Tuple
 import logging
-from datetime import datetime, timezone, timedelta
+import time
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4096)
+def _edge_prefix(edge_id: str) -> str:
+    """Key prefix shared by all Redis keys of an edge"""
+    return f"edge:{edge_id}:"
+
+
 class BaselineCacheService:
     """
     Baseline caching service using LRU (Least Recently Used) and LFU (Least Frequently Used) strategies.
@@ -19,28 +26,38 @@ class BaselineCacheService:
     """
     
     def __init__(self):
-        self.redis_client = redis.Redis(
+        self.redis_client = aioredis.Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             password=settings.REDIS_PASSWORD,
             db=settings.REDIS_DB,
-            decode_responses=True
+            decode_responses=True,
+            max_connections=100
+        )
+        # Binary client for size probes and key scans that never need values as text
+        self.redis_raw = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            decode_responses=False,
+            max_connections=100
         )
         self.default_ttl = 3600  # 1 hour default TTL
     
     def get_cache_key(self, edge_id: str, content_id: str) -> str:
         """Generate Redis key for cache entry"""
-        return f"edge:{edge_id}:content:{content_id}"
+        return _edge_prefix(edge_id) + "content:" + content_id
     
     def get_access_key(self, edge_id: str, content_id: str) -> str:
         """Generate Redis key for access tracking (LRU)"""
-        return f"edge:{edge_id}:access:{content_id}"
+        return _edge_prefix(edge_id) + "access:" + content_id
     
     def get_frequency_key(self, edge_id: str, content_id: str) -> str:
         """Generate Redis key for frequency tracking (LFU)"""
-        return f"edge:{edge_id}:freq:{content_id}"
+        return _edge_prefix(edge_id) + "freq:" + content_id
     
-    def cache_content(
+    async def cache_content(
         self,
         edge_id: str,
         content_id: str,
@@ -66,21 +83,22 @@ class BaselineCacheService:
             
             ttl = ttl_seconds or self.default_ttl
             
-            # Store content
-            self.redis_client.setex(cache_key, ttl, content_data)
-            
-            # Track access time (for LRU)
-            self.redis_client.setex(access_key, ttl, str(datetime.now(timezone.utc).timestamp()))
-            
-            # Track frequency (for LFU) - initialize to 1
-            self.redis_client.setex(freq_key, ttl, "1")
+            # One pipelined round-trip on a single pool connection
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                # Store content
+                pipe.setex(cache_key, ttl, content_data)
+                # Track access time (for LRU)
+                pipe.setex(access_key, ttl, str(time.time()))
+                # Track frequency (for LFU) - initialize to 1
+                pipe.setex(freq_key, ttl, "1")
+                await pipe.execute()
             
             return True
         except Exception as e:
             logger.error(f"Error caching content: {e}", exc_info=True)
             return False
     
-    def get_content(self, edge_id: str, content_id: str) -> Optional[str]:
+    async def get_content(self, edge_id: str, content_id: str) -> Optional[str]:
         """
         Get content from cache and update access tracking.
         
@@ -96,23 +114,23 @@ class BaselineCacheService:
             access_key = self.get_access_key(edge_id, content_id)
             freq_key = self.get_frequency_key(edge_id, content_id)
             
-            content = self.redis_client.get(cache_key)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(cache_key)
+                pipe.ttl(cache_key)
+                content, ttl = await pipe.execute()
             
             if content:
-                # Update access time (LRU)
-                ttl = self.redis_client.ttl(cache_key)
                 if ttl > 0:
-                    self.redis_client.setex(
-                        access_key,
-                        ttl,
-                        str(datetime.now(timezone.utc).timestamp())
-                    )
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        # Update access time (LRU)
+                        pipe.setex(access_key, ttl, str(time.time()))
+                        pipe.get(freq_key)
+                        _, current_freq = await pipe.execute()
                     
                     # Increment frequency (LFU)
-                    current_freq = self.redis_client.get(freq_key)
                     if current_freq:
                         new_freq = int(current_freq) + 1
-                        self.redis_client.setex(freq_key, ttl, str(new_freq))
+                        await self.redis_client.setex(freq_key, ttl, str(new_freq))
                 
                 return content
             
@@ -121,7 +139,7 @@ class BaselineCacheService:
             logger.error(f"Error getting content from cache: {e}", exc_info=True)
             return None
     
-    def evict_lru(self, edge_id: str, max_items: int = 10) -> List[str]:
+    async def evict_lru(self, edge_id: str, max_items: int = 10) -> List[str]:
         """
         Evict least recently used items (LRU strategy).
         
@@ -134,17 +152,18 @@ class BaselineCacheService:
         """
         try:
             # Get all access keys for this edge
-            pattern = f"edge:{edge_id}:access:*"
-            keys = self.redis_client.keys(pattern)
+            pattern = _edge_prefix(edge_id) + "access:*"
+            keys = await self.redis_client.keys(pattern)
             
             if len(keys) <= max_items:
                 return []
             
             # Get access times and sort by least recent
             access_times = []
-            for key in keys:
+            # Single MGET: one connection regardless of how many keys the edge has
+            values = await self.redis_client.mget(keys)
+            for key, access_time_str in zip(keys, values):
                 content_id = key.split(":")[-1]
-                access_time_str = self.redis_client.get(key)
                 if access_time_str:
                     try:
                         access_time = float(access_time_str)
@@ -162,9 +181,7 @@ class BaselineCacheService:
                 access_key = self.get_access_key(edge_id, content_id)
                 freq_key = self.get_frequency_key(edge_id, content_id)
                 
-                self.redis_client.delete(cache_key)
-                self.redis_client.delete(access_key)
-                self.redis_client.delete(freq_key)
+                await self.redis_client.delete(cache_key, access_key, freq_key)
                 evicted.append(content_id)
             
             return evicted
@@ -172,7 +189,7 @@ class BaselineCacheService:
             logger.error(f"Error evicting LRU items: {e}", exc_info=True)
             return []
     
-    def evict_lfu(self, edge_id: str, max_items: int = 10) -> List[str]:
+    async def evict_lfu(self, edge_id: str, max_items: int = 10) -> List[str]:
         """
         Evict least frequently used items (LFU strategy).
         
@@ -185,17 +202,18 @@ class BaselineCacheService:
         """
         try:
             # Get all frequency keys for this edge
-            pattern = f"edge:{edge_id}:freq:*"
-            keys = self.redis_client.keys(pattern)
+            pattern = _edge_prefix(edge_id) + "freq:*"
+            keys = await self.redis_client.keys(pattern)
             
             if len(keys) <= max_items:
                 return []
             
             # Get frequencies and sort by least frequent
             frequencies = []
-            for key in keys:
+            # Single MGET: one connection regardless of how many keys the edge has
+            values = await self.redis_client.mget(keys)
+            for key, freq_str in zip(keys, values):
                 content_id = key.split(":")[-1]
-                freq_str = self.redis_client.get(key)
                 if freq_str:
                     try:
                         freq = int(freq_str)
@@ -213,9 +231,7 @@ class BaselineCacheService:
                 access_key = self.get_access_key(edge_id, content_id)
                 freq_key = self.get_frequency_key(edge_id, content_id)
                 
-                self.redis_client.delete(cache_key)
-                self.redis_client.delete(access_key)
-                self.redis_client.delete(freq_key)
+                await self.redis_client.delete(cache_key, access_key, freq_key)
                 evicted.append(content_id)
             
             return evicted
@@ -223,7 +239,7 @@ class BaselineCacheService:
             logger.error(f"Error evicting LFU items: {e}", exc_info=True)
             return []
     
-    def get_cache_stats(self, edge_id: str) -> Dict[str, any]:
+    async def get_cache_stats(self, edge_id: str) -> Dict[str, any]:
         """
         Get cache statistics for an edge.
         
@@ -234,16 +250,18 @@ class BaselineCacheService:
             Cache statistics dictionary
         """
         try:
-            pattern = f"edge:{edge_id}:content:*"
-            keys = self.redis_client.keys(pattern)
+            pattern = _edge_prefix(edge_id) + "content:*"
+            keys = [key async for key in self.redis_raw.scan_iter(match=pattern, count=1000)]
             
             total_items = len(keys)
             total_size = 0
             
-            for key in keys:
-                content = self.redis_client.get(key)
-                if content:
-                    total_size += len(content.encode('utf-8'))
+            # STRLEN reports the stored byte length server-side, so payloads are never transferred
+            if keys:
+                async with self.redis_raw.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.strlen(key)
+                    total_size = sum(await pipe.execute())
             
             return {
                 "total_items": total_items,
@@ -5,9 +5,16 @@ Applies AI decisions to edge caches via edge simulator
 import httpx
 import logging
 from typing import List, Dict, Any, Optional
+from prometheus_client import Counter
 
 logger = logging.getLogger(__name__)
 
+DECISIONS_APPLIED = Counter(
+    "cdn_decisions_applied_total",
+    "AI cache decisions applied to edge nodes",
+    ["op", "result"]
+)
+
 
 class CDNLogicService:
     """Service for applying cache decisions to edge nodes"""
@@ -20,9 +27,16 @@ class CDNLogicService:
             edge_sim_url: Edge simulator base URL
         """
         self.edge_sim_url = edge_sim_url
+        # One multiplexed HTTP/2 pool shared by every decision call
         self.client = httpx.AsyncClient(
             base_url=edge_sim_url,
-            timeout=10.0
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=2.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=100,
+                keepalive_expiry=30.0
+            )
         )
     
     async def apply_prefetch(
@@ -45,18 +59,20 @@ class CDNLogicService:
         try:
             response = await self.client.post(
                 f"/api/v1/edges/{edge_id}/cache/prefetch",
-                params={"content_id": content_id, "ttl_seconds": ttl_seconds},
-                timeout=10.0
+                params={"content_id": content_id, "ttl_seconds": ttl_seconds}
             )
             
             if response.status_code in [200, 201]:
-                logger.info(f"Prefetched {content_id} to {edge_id}")
+                logger.debug("Prefetched %s to %s", content_id, edge_id)
+                DECISIONS_APPLIED.labels("prefetch", "success").inc()
                 return True
             else:
-                logger.warning(f"Prefetch failed: {response.status_code}")
+                logger.warning("Prefetch failed: %s", response.status_code)
+                DECISIONS_APPLIED.labels("prefetch", "failed").inc()
                 return False
         except Exception as e:
-            logger.error(f"Error applying prefetch: {e}")
+            logger.error("Error applying prefetch: %s", e)
+            DECISIONS_APPLIED.labels("prefetch", "error").inc()
             return False
     
     async def apply_eviction(
@@ -76,18 +92,20 @@ class CDNLogicService:
         """
         try:
             response = await self.client.delete(
-                f"/api/v1/edges/{edge_id}/cache/{content_id}",
-                timeout=10.0
+                f"/api/v1/edges/{edge_id}/cache/{content_id}"
             )
             
             if response.status_code in [200, 204]:
-                logger.info(f"Evicted {content_id} from {edge_id}")
+                logger.debug("Evicted %s from %s", content_id, edge_id)
+                DECISIONS_APPLIED.labels("eviction", "success").inc()
                 return True
             else:
-                logger.warning(f"Eviction failed: {response.status_code}")
+                logger.warning("Eviction failed: %s", response.status_code)
+                DECISIONS_APPLIED.labels("eviction", "failed").inc()
                 return False
         except Exception as e:
-            logger.error(f"Error applying eviction: {e}")
+            logger.error("Error applying eviction: %s", e)
+            DECISIONS_APPLIED.labels("eviction", "error").inc()
             return False
     
     async def apply_ttl_update(
@@ -110,18 +128,20 @@ class CDNLogicService:
         try:
             response = await self.client.put(
                 f"/api/v1/edges/{edge_id}/cache/{content_id}/ttl",
-                params={"ttl_seconds": ttl_seconds},
-                timeout=10.0
+                params={"ttl_seconds": ttl_seconds}
             )
             
             if response.status_code == 200:
-                logger.info(f"Updated TTL for {content_id} at {edge_id} to {ttl_seconds}s")
+                logger.debug("Updated TTL for %s at %s to %ss", content_id, edge_id, ttl_seconds)
+                DECISIONS_APPLIED.labels("ttl_update", "success").inc()
                 return True
             else:
-                logger.warning(f"TTL update failed: {response.status_code}")
+                logger.warning("TTL update failed: %s", response.status_code)
+                DECISIONS_APPLIED.labels("ttl_update", "failed").inc()
                 return False
         except Exception as e:
-            logger.error(f"Error applying TTL update: {e}")
+            logger.error("Error applying TTL update: %s", e)
+            DECISIONS_APPLIED.labels("ttl_update", "error").inc()
             return False
     
     async def apply_decisions(
@@ -182,7 +202,7 @@ class CDNLogicService:
             else:
                 results["ttl_updates"]["failed"] += 1
         
-        logger.info(f"Applied decisions: {results}")
+        logger.info("Applied decisions: %s", results)
         return results
     
     async def close(self):
@@ -3,15 +3,57 @@ Redis Cache Adapter for Edge Nodes
 Handles cache operations with TTL support
 """
 import redis
-import json
+from redis import asyncio as aioredis
 import logging
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+import zstandard as zstd
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+import time
 
 from edge.config import settings
 
 logger = logging.getLogger(__name__)
 
+# SCAN page-size hint and number of keys sent per pipeline round-trip
+SCAN_COUNT = 1000
+KEY_BATCH_SIZE = 500
+
+# One connection pool for the whole process; edges only differ by key prefix.
+# Blocking: under load, callers wait (up to timeout seconds) for a free connection
+# instead of failing with "Too many connections"
+_POOL = aioredis.BlockingConnectionPool(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    db=settings.REDIS_DB,
+    max_connections=64,
+    timeout=5
+)
+
+# Bodies larger than this are zstd-compressed; a 1-byte tag records which
+ZSTD_MIN_SIZE = 1024
+_BODY_RAW = b"\x00"
+_BODY_ZSTD = b"\x01"
+_ZSTD_CCTX = zstd.ZstdCompressor(level=3)
+_ZSTD_DCTX = zstd.ZstdDecompressor()
+
+
+def _encode_body(body: bytes) -> bytes:
+    """Tag a body for storage, compressing it if it is large enough to benefit"""
+    if len(body) > ZSTD_MIN_SIZE:
+        return _BODY_ZSTD + _ZSTD_CCTX.compress(body)
+    return _BODY_RAW + body
+
+
+def _decode_body(stored: bytes) -> bytes:
+    """Reverse _encode_body"""
+    tag, payload = stored[:1], stored[1:]
+    if tag == _BODY_ZSTD:
+        return _ZSTD_DCTX.decompress(payload)
+    if tag == _BODY_RAW:
+        return payload
+    raise ValueError(f"Unknown body encoding tag: {tag!r}")
+
+
 class EdgeCache:
     """Redis-based edge cache with TTL management"""
     
@@ -19,24 +61,34 @@ class EdgeCache:
         """
         Initialize edge cache for a specific edge node.
         
+        All edges share the same Redis pool; edge_id only namespaces the keys.
+        
         Args:
             edge_id: Edge node identifier (e.g., 'edge-us-east')
         """
         self.edge_id = edge_id
-        self.redis_client = redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            password=settings.REDIS_PASSWORD,
-            db=settings.REDIS_DB,
-            decode_responses=True
-        )
+        self._key_prefix = f"edge:{edge_id}:content:"
+        self.redis_client = aioredis.Redis(connection_pool=_POOL)
         self.default_ttl = settings.DEFAULT_TTL_SECONDS
         
     def _get_cache_key(self, content_id: str) -> str:
         """Generate Redis key for content at this edge"""
-        return f"edge:{self.edge_id}:content:{content_id}"
+        return self._key_prefix + content_id
     
-    def get(self, content_id: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _decode_entry(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+        """Rebuild a cache entry from its Redis hash fields"""
+        return {
+            "body": _decode_body(fields[b"body"]),
+            "content_type": fields[b"ct"].decode(),
+            "_meta": {
+                "cached_at": int(fields[b"cached_at"]),
+                "edge_id": fields[b"edge_id"].decode(),
+                "ttl": int(fields[b"ttl"])
+            }
+        }
+    
+    async def get(self, content_id: str) -> Optional[Dict[str, Any]]:
         """
         Get content from cache.
         
@@ -44,57 +96,114 @@ class EdgeCache:
             content_id: Content identifier
         
         Returns:
-            Content data if found, None if cache miss
+            Cache entry ({"body": ..., "content_type": ..., "_meta": {...}}) if found, None if cache miss
         """
         try:
             cache_key = self._get_cache_key(content_id)
-            cached_data = self.redis_client.get(cache_key)
+            cached_data = await self.redis_client.hgetall(cache_key)
             
             if cached_data:
-                data = json.loads(cached_data)
-                logger.debug(f"Cache HIT: {content_id} at {self.edge_id}")
+                data = self._decode_entry(cached_data)
+                logger.debug("Cache HIT: %s at %s", content_id, self.edge_id)
                 return data
             else:
-                logger.debug(f"Cache MISS: {content_id} at {self.edge_id}")
+                logger.debug("Cache MISS: %s at %s", content_id, self.edge_id)
                 return None
         except redis.RedisError as e:
             logger.error(f"Redis error getting {content_id}: {e}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error for {content_id}: {e}")
+        except (KeyError, ValueError, zstd.ZstdError) as e:
+            logger.error(f"Decode error for {content_id}: {e}")
             # Remove corrupted cache entry
-            self.delete(content_id)
+            await self.delete(content_id)
             return None
     
-    def set(self, content_id: str, content_data: Dict[str, Any], ttl_seconds: Optional[int] = None) -> bool:
+    async def get_with_ttl(self, content_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """
+        Get content and its remaining TTL in a single pipelined round-trip.
+        
+        Args:
+            content_id: Content identifier
+        
+        Returns:
+            Tuple of (cache entry, remaining TTL in seconds); (None, None) on cache miss
+        """
+        try:
+            cache_key = self._get_cache_key(content_id)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.hgetall(cache_key)
+                pipe.ttl(cache_key)
+                cached_data, ttl = await pipe.execute()
+            
+            if cached_data:
+                data = self._decode_entry(cached_data)
+                logger.debug("Cache HIT: %s at %s", content_id, self.edge_id)
+                return data, (ttl if ttl >= 0 else None)
+            else:
+                logger.debug("Cache MISS: %s at %s", content_id, self.edge_id)
+                return None, None
+        except redis.RedisError as e:
+            logger.error(f"Redis error getting {content_id}: {e}")
+            return None, None
+        except (KeyError, ValueError, zstd.ZstdError) as e:
+            logger.error(f"Decode error for {content_id}: {e}")
+            # Remove corrupted cache entry
+            await self.delete(content_id)
+            return None, None
+    
+    async def set(
+        self,
+        content_id: str,
+        body: bytes,
+        ttl_seconds: Optional[int] = None,
+        nx: bool = False,
+        content_type: str = "application/json"
+    ) -> bool:
         """
         Store content in cache with TTL.
         
+        The body (e.g. the raw origin response) is not re-serialized; bodies
+        over ZSTD_MIN_SIZE are zstd-compressed.
+        
         Args:
             content_id: Content identifier
-            content_data: Content data to cache
+            body: Raw content body to cache
             ttl_seconds: Time to live in seconds (uses default if None)
+            nx: Only store if the content is not already cached
+            content_type: Media type of the body
         
         Returns:
-            True if successful, False otherwise
+            True if stored, False if it failed (or, with nx, was already cached)
         """
         try:
             cache_key = self._get_cache_key(content_id)
             ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl
             
-            # Add metadata
-            cache_entry = {
-                **content_data,
-                "_cached_at": datetime.utcnow().isoformat(),
-                "_edge_id": self.edge_id,
-                "_ttl": ttl
+            # Body is tagged/compressed by _encode_body; metadata lives in plain hash fields
+            fields = {
+                "body": _encode_body(body),
+                "ct": content_type,
+                "cached_at": int(time.time() * 1000),  # epoch ms
+                "edge_id": self.edge_id,
+                "ttl": ttl
             }
             
-            serialized = json.dumps(cache_entry)
-            result = self.redis_client.setex(cache_key, ttl, serialized)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                if nx:
+                    # Only fill a missing entry; an existing one keeps its fields and TTL
+                    for field, value in fields.items():
+                        pipe.hsetnx(cache_key, field, value)
+                    pipe.expire(cache_key, ttl, nx=True)
+                    result = bool((await pipe.execute())[0])
+                else:
+                    # Replace any previous entry atomically so no stale fields or TTL survive
+                    pipe.unlink(cache_key)
+                    pipe.hset(cache_key, mapping=fields)
+                    pipe.expire(cache_key, ttl)
+                    _, _, result = await pipe.execute()
             
             if result:
-                logger.debug(f"Cached {content_id} at {self.edge_id} with TTL {ttl}s")
+                logger.debug("Cached %s at %s with TTL %ss", content_id, self.edge_id, ttl)
             return result
         except redis.RedisError as e:
             logger.error(f"Redis error setting {content_id}: {e}")
@@ -103,7 +212,7 @@ class EdgeCache:
             logger.error(f"Serialization error for {content_id}: {e}")
             return False
     
-    def delete(self, content_id: str) -> bool:
+    async def delete(self, content_id: str) -> bool:
         """
         Delete content from cache.
         
@@ -115,15 +224,15 @@ class EdgeCache:
         """
         try:
             cache_key = self._get_cache_key(content_id)
-            result = self.redis_client.delete(cache_key)
+            result = await self.redis_client.unlink(cache_key)
             if result:
-                logger.debug(f"Deleted {content_id} from cache at {self.edge_id}")
+                logger.debug("Deleted %s from cache at %s", content_id, self.edge_id)
             return bool(result)
         except redis.RedisError as e:
             logger.error(f"Redis error deleting {content_id}: {e}")
             return False
     
-    def exists(self, content_id: str) -> bool:
+    async def exists(self, content_id: str) -> bool:
         """
         Check if content exists in cache.
         
@@ -135,12 +244,12 @@ class EdgeCache:
         """
         try:
             cache_key = self._get_cache_key(content_id)
-            return bool(self.redis_client.exists(cache_key))
+            return bool(await self.redis_client.exists(cache_key))
         except redis.RedisError as e:
             logger.error(f"Redis error checking {content_id}: {e}")
             return False
     
-    def get_ttl(self, content_id: str) -> Optional[int]:
+    async def get_ttl(self, content_id: str) -> Optional[int]:
         """
         Get remaining TTL for content.
         
@@ -152,13 +261,13 @@ class EdgeCache:
         """
         try:
             cache_key = self._get_cache_key(content_id)
-            ttl = self.redis_client.ttl(cache_key)
+            ttl = await self.redis_client.ttl(cache_key)
             return ttl if ttl >= 0 else None
         except redis.RedisError as e:
             logger.error(f"Redis error getting TTL for {content_id}: {e}")
             return None
     
-    def update_ttl(self, content_id: str, ttl_seconds: int) -> bool:
+    async def update_ttl(self, content_id: str, ttl_seconds: int) -> bool:
         """
         Update TTL for existing cache entry.
         
@@ -171,17 +280,28 @@ class EdgeCache:
         """
         try:
             cache_key = self._get_cache_key(content_id)
-            if self.redis_client.exists(cache_key):
-                result = self.redis_client.expire(cache_key, ttl_seconds)
-                if result:
-                    logger.debug(f"Updated TTL for {content_id} to {ttl_seconds}s")
-                return result
-            return False
+            # XX: only applies to an existing key, so no separate EXISTS round-trip
+            result = await self.redis_client.expire(cache_key, ttl_seconds, xx=True)
+            if result:
+                logger.debug("Updated TTL for %s to %ss", content_id, ttl_seconds)
+            return bool(result)
         except redis.RedisError as e:
             logger.error(f"Redis error updating TTL for {content_id}: {e}")
             return False
     
-    def get_cache_stats(self) -> Dict[str, Any]:
+    async def _scan_key_batches(self) -> AsyncIterator[List[bytes]]:
+        """Incrementally SCAN this edge's content keys, yielding them in batches"""
+        pattern = self._key_prefix + "*"
+        batch = []
+        async for key in self.redis_client.scan_iter(match=pattern, count=SCAN_COUNT):
+            batch.append(key)
+            if len(batch) >= KEY_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    async def get_cache_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics for this edge.
         
@@ -189,21 +309,19 @@ class EdgeCache:
             Dictionary with cache statistics
         """
         try:
-            pattern = f"edge:{self.edge_id}:content:*"
-            keys = self.redis_client.keys(pattern)
-            
+            cached_items = 0
             total_size = 0
-            for key in keys:
-                try:
-                    value = self.redis_client.get(key)
-                    if value:
-                        total_size += len(value)
-                except:
-                    pass
+            async for batch in self._scan_key_batches():
+                # HSTRLEN measures payloads server-side without transferring them
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key in batch:
+                        pipe.hstrlen(key, "body")
+                    total_size += sum(await pipe.execute())
+                cached_items += len(batch)
             
             return {
                 "edge_id": self.edge_id,
-                "cached_items": len(keys),
+                "cached_items": cached_items,
                 "estimated_size_bytes": total_size,
                 "estimated_size_mb": round(total_size / (1024 * 1024), 2),
                 "capacity_mb": settings.EDGE_CACHE_CAPACITY_MB
@@ -219,7 +337,7 @@ class EdgeCache:
                 "error": str(e)
             }
     
-    def clear_cache(self) -> int:
+    async def clear_cache(self) -> int:
         """
         Clear all cached content for this edge.
         
@@ -227,13 +345,12 @@ class EdgeCache:
             Number of keys deleted
         """
         try:
-            pattern = f"edge:{self.edge_id}:content:*"
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                deleted = self.redis_client.delete(*keys)
+            deleted = 0
+            async for batch in self._scan_key_batches():
+                deleted += await self.redis_client.unlink(*batch)
+            if deleted:
                 logger.info(f"Cleared {deleted} items from cache at {self.edge_id}")
-                return deleted
-            return 0
+            return deleted
         except redis.RedisError as e:
             logger.error(f"Redis error clearing cache: {e}")
             return 0
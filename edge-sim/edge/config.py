@@ -2,6 +2,7 @@
 Edge Simulator Configuration
 """
 from pydantic_settings import BaseSettings
+from functools import cached_property
 from typing import Optional, List
 
 class Settings(BaseSettings):
@@ -30,9 +31,9 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     
-    @property
+    @cached_property
     def edge_regions_list(self) -> List[str]:
-        """Parse edge regions from comma-separated string"""
+        """Parse edge regions from comma-separated string (once per Settings instance)"""
         return [r.strip() for r in self.EDGE_REGIONS.split(",")]
     
     class Config:
@@ -4,15 +4,16 @@ Simulates edge nodes with Redis caching
 """
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Coroutine, Tuple
 import logging
 import time
 import asyncio
 
 from edge.config import settings
 from edge.cache import EdgeCache
-from edge.origin_client import OriginClient
+from edge.origin_client import OriginClient, parse_content
 from edge.metrics import MetricsLogger
 
 # Configure logging
@@ -25,7 +26,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Smart CDN Edge Simulator",
     description="Edge node cache simulation service",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -44,6 +46,19 @@ metrics_logger: Optional[MetricsLogger] = None
 # Edge cache instances for each region
 edge_caches: Dict[str, EdgeCache] = {}
 
+# Edge used when a request names none: the first configured region
+_DEFAULT_EDGE_ID = f"edge-{settings.edge_regions_list[0]}"
+
+# Strong references to fire-and-forget tasks so they are not collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+# Origin fetches in progress, keyed by (edge_id, content_id), shared by concurrent MISSes
+_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+# Last Redis health probe as (monotonic time, healthy); reused for HEALTH_CACHE_SECONDS
+HEALTH_CACHE_SECONDS = 1.0
+_redis_health: Tuple[float, bool] = (float("-inf"), False)
+
 
 # Request/Response Models
 class ContentRequest(BaseModel):
@@ -107,7 +122,63 @@ def get_edge_id(edge_id: Optional[str] = None, x_edge_id: Optional[str] = Header
         return x_edge_id
     
     # Default to first region
-    return f"edge-{settings.edge_regions_list[0]}"
+    return _DEFAULT_EDGE_ID
+
+
+def _on_background_task_done(task: asyncio.Task) -> None:
+    """Release a finished background task and log its failure, if any"""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background task failed: {task.exception()}")
+
+
+def run_in_background(coro: Coroutine) -> None:
+    """Schedule a coroutine without awaiting it; errors are logged, not raised"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+
+async def fetch_origin_coalesced(edge_id: str, content_id: str) -> Tuple[Optional[Tuple[bytes, int]], bool]:
+    """
+    Fetch content from origin, joining an identical fetch already in flight.
+    
+    Args:
+        edge_id: Edge node the MISS happened at
+        content_id: Content identifier
+    
+    Returns:
+        Tuple of (origin fetch result or None, whether this caller performed the fetch)
+    """
+    key = (edge_id, content_id)
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        # Shield so a cancelled waiter doesn't cancel the fetch shared with others
+        try:
+            return await asyncio.shield(inflight), False
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The leader was cancelled (not this waiter); fetch again instead of failing
+            return await fetch_origin_coalesced(edge_id, content_id)
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        origin_content = await origin_client.fetch_content(content_id)
+        future.set_result(origin_content)
+        return origin_content, True
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the error retrieved so it isn't logged as "never retrieved" when nobody waited
+        future.exception()
+        raise
+    except BaseException:
+        # Leader cancelled; waiters see a cancelled future and retry on their own
+        future.cancel()
+        raise
+    finally:
+        _inflight.pop(key, None)
 
 
 def get_edge_cache(edge_id: str) -> EdgeCache:
@@ -132,16 +203,22 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    redis_healthy = False
+    global _redis_health
     origin_healthy = False
     
-    try:
-        # Check Redis
-        test_cache = EdgeCache("test")
-        test_cache.redis_client.ping()
-        redis_healthy = True
-    except Exception as e:
-        logger.error(f"Redis health check failed: {e}")
+    # Check Redis (at most once per HEALTH_CACHE_SECONDS)
+    checked_at, redis_healthy = _redis_health
+    now = time.monotonic()
+    if now - checked_at >= HEALTH_CACHE_SECONDS:
+        redis_healthy = False
+        try:
+            # All edge caches share one pool, so any of them can be used for the probe
+            probe = next(iter(edge_caches.values()), None) or get_edge_cache(_DEFAULT_EDGE_ID)
+            await probe.redis_client.ping()
+            redis_healthy = True
+        except Exception as e:
+            logger.error(f"Redis health check failed: {e}")
+        _redis_health = (now, redis_healthy)
     
     # Check origin
     if origin_client:
@@ -172,53 +249,65 @@ async def get_content(
     resolved_edge_id = get_edge_id(edge_id, x_edge_id)
     cache = get_edge_cache(resolved_edge_id)
     
-    # Try cache first
-    cached_content = cache.get(content_id)
+    # Try cache first (content and TTL in one round-trip)
+    cached_content, ttl = await cache.get_with_ttl(content_id)
     
     if cached_content:
         # Cache HIT
         response_time_ms = settings.CACHE_HIT_LATENCY_MS
         is_cache_hit = True
-        content_data = {k: v for k, v in cached_content.items() if not k.startswith("_")}
-        ttl = cache.get_ttl(content_id)
+        content_data = parse_content(cached_content["body"])
         
-        logger.info(f"CACHE HIT: {content_id} at {resolved_edge_id} (TTL: {ttl}s)")
+        # DEBUG only: every request is already recorded by the metrics logger
+        logger.debug("CACHE HIT: %s at %s (TTL: %ss)", content_id, resolved_edge_id, ttl)
     else:
         # Cache MISS - fetch from origin
         if not origin_client:
             raise HTTPException(status_code=503, detail="Origin client not initialized")
         
-        origin_content = await origin_client.fetch_content(content_id)
+        origin_content, is_fetcher = await fetch_origin_coalesced(resolved_edge_id, content_id)
         
         if not origin_content:
             raise HTTPException(status_code=404, detail=f"Content {content_id} not found")
         
-        # Store in cache
-        content_data = {k: v for k, v in origin_content.items() if not k.startswith("_")}
+        body, _ = origin_content
+        content_data = parse_content(body)
         ttl = settings.DEFAULT_TTL_SECONDS
-        cache.set(content_id, content_data, ttl_seconds=ttl)
+        
+        # Store the origin body as-is (async, don't wait); only the request that fetched writes it
+        if is_fetcher:
+            run_in_background(cache.set(content_id, body, ttl_seconds=ttl))
         
         response_time_ms = settings.CACHE_MISS_LATENCY_MS
         is_cache_hit = False
         
-        logger.info(f"CACHE MISS: {content_id} at {resolved_edge_id} (fetched from origin)")
+        logger.info("CACHE MISS: %s at %s (fetched from origin)", content_id, resolved_edge_id)
     
-    # Log metrics (async, don't wait)
+    # Log metrics (queued, flushed to the backend in batches)
     if metrics_logger:
-        asyncio.create_task(metrics_logger.log_request(
+        metrics_logger.log_request(
             content_id=content_id,
             edge_id=resolved_edge_id,
             is_cache_hit=is_cache_hit,
             response_time_ms=response_time_ms
-        ))
+        )
     
-    return ContentResponse(
-        content_id=content_id,
-        edge_id=resolved_edge_id,
-        is_cache_hit=is_cache_hit,
-        response_time_ms=response_time_ms,
-        content_data=content_data,
-        cache_ttl_seconds=ttl
+    # Serialize the ContentResponse shape directly; skips pydantic revalidation per request.
+    # Cache status is mirrored in headers so clients can skip parsing the body.
+    return ORJSONResponse(
+        content={
+            "content_id": content_id,
+            "edge_id": resolved_edge_id,
+            "is_cache_hit": is_cache_hit,
+            "response_time_ms": response_time_ms,
+            "content_data": content_data,
+            "cache_ttl_seconds": ttl
+        },
+        headers={
+            "X-Cache-Hit": "1" if is_cache_hit else "0",
+            "X-Response-Time-Ms": str(response_time_ms),
+            "X-Edge-Id": resolved_edge_id
+        }
     )
 
 
@@ -226,14 +315,14 @@ async def get_content(
 async def get_cache_stats(edge_id: str):
     """Get cache statistics for an edge"""
     cache = get_edge_cache(edge_id)
-    return cache.get_cache_stats()
+    return await cache.get_cache_stats()
 
 
 @app.delete("/api/v1/edges/{edge_id}/cache/{content_id}")
 async def evict_content(edge_id: str, content_id: str):
     """Evict content from edge cache"""
     cache = get_edge_cache(edge_id)
-    deleted = cache.delete(content_id)
+    deleted = await cache.delete(content_id)
     
     if deleted:
         return {"status": "success", "message": f"Evicted {content_id} from {edge_id}"}
@@ -249,8 +338,8 @@ async def prefetch_content(edge_id: str, content_id: str, ttl_seconds: Optional[
     
     cache = get_edge_cache(edge_id)
     
-    # Check if already cached
-    if cache.exists(content_id):
+    # Check if already cached (skips the origin fetch in the common case)
+    if await cache.exists(content_id):
         return {
             "status": "already_cached",
             "message": f"{content_id} already in cache at {edge_id}"
@@ -262,10 +351,11 @@ async def prefetch_content(edge_id: str, content_id: str, ttl_seconds: Optional[
     if not origin_content:
         raise HTTPException(status_code=404, detail=f"Content {content_id} not found at origin")
     
-    # Store in cache
-    content_data = {k: v for k, v in origin_content.items() if not k.startswith("_")}
+    # Store the origin body in cache as-is
+    body, _ = origin_content
     ttl = ttl_seconds if ttl_seconds else settings.DEFAULT_TTL_SECONDS
-    success = cache.set(content_id, content_data, ttl_seconds=ttl)
+    # NX so a concurrent fill that landed during the origin fetch is not overwritten
+    success = await cache.set(content_id, body, ttl_seconds=ttl, nx=True)
     
     if success:
         return {
@@ -273,6 +363,11 @@ async def prefetch_content(edge_id: str, content_id: str, ttl_seconds: Optional[
             "message": f"Prefetched {content_id} into {edge_id}",
             "ttl_seconds": ttl
         }
+    elif await cache.exists(content_id):
+        return {
+            "status": "already_cached",
+            "message": f"{content_id} already in cache at {edge_id}"
+        }
     else:
         raise HTTPException(status_code=500, detail="Failed to cache content")
 
@@ -281,7 +376,7 @@ async def prefetch_content(edge_id: str, content_id: str, ttl_seconds: Optional[
 async def update_ttl(edge_id: str, content_id: str, ttl_seconds: int):
     """Update TTL for cached content"""
     cache = get_edge_cache(edge_id)
-    success = cache.update_ttl(content_id, ttl_seconds)
+    success = await cache.update_ttl(content_id, ttl_seconds)
     
     if success:
         return {
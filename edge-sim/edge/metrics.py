@@ -2,10 +2,11 @@
 Metrics Logging Service
 Logs request metrics to backend database
 """
+import asyncio
 import httpx
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from edge.config import settings
@@ -13,17 +14,43 @@ from edge.config import settings
 logger = logging.getLogger(__name__)
 
 class MetricsLogger:
-    """Logs request metrics to backend API"""
+    """Logs request metrics to backend API in periodic batches"""
     
-    def __init__(self):
-        """Initialize metrics logger"""
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_queue_size: int = 10_000
+    ):
+        """
+        Initialize metrics logger and start the background flusher.
+        Must be called from a running event loop.
+        
+        Args:
+            batch_size: Maximum records sent per backend request
+            flush_interval: Seconds between flushes
+            max_queue_size: Records buffered before new ones are dropped
+        """
         self.backend_url = settings.ORIGIN_SERVER_URL
         self.client = httpx.AsyncClient(
             base_url=self.backend_url,
-            timeout=10.0
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=100,
+                keepalive_expiry=60.0
+            )
         )
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        # Batch taken off the queue whose send is in progress; resent by close() if interrupted
+        self._pending: List[Dict[str, Any]] = []
+        self._task = asyncio.create_task(self._flusher())
     
-    async def log_request(
+    def log_request(
         self,
         content_id: str,
         edge_id: str,
@@ -34,7 +61,7 @@ class MetricsLogger:
         experiment_id: Optional[int] = None
     ) -> bool:
         """
-        Log request to backend database.
+        Queue a request record for the next batch sent to the backend.
         
         Args:
             content_id: Content identifier
@@ -46,36 +73,71 @@ class MetricsLogger:
             experiment_id: Experiment ID (optional)
         
         Returns:
-            True if logged successfully, False otherwise
+            True if queued, False if the queue is full and the record was dropped
         """
+        request_data = {
+            "content_id": content_id,
+            "edge_id": edge_id,
+            "is_cache_hit": is_cache_hit,
+            "response_time_ms": response_time_ms,
+            "request_timestamp": int(time.time() * 1000),  # epoch ms, formatted at flush
+            "user_ip": user_ip,
+            "user_agent": user_agent,
+            "experiment_id": experiment_id
+        }
+        
         try:
-            request_data = {
-                "content_id": content_id,
-                "edge_id": edge_id,
-                "is_cache_hit": is_cache_hit,
-                "response_time_ms": response_time_ms,
-                "request_timestamp": datetime.utcnow().isoformat(),
-                "user_ip": user_ip,
-                "user_agent": user_agent,
-                "experiment_id": experiment_id
+            self._queue.put_nowait(request_data)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.debug("Metrics queue full, dropped record for %s (%s dropped)", content_id, self.dropped)
+            return False
+    
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Pop up to batch_size queued records without waiting"""
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+    
+    async def _send_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Send a batch of request records to the backend.
+        
+        Args:
+            batch: Request records to log
+        
+        Returns:
+            True if logged successfully, False otherwise
+        """
+        # The backend expects ISO timestamps; format here, off the request path.
+        # Copies, so a batch interrupted mid-send can be sent again unchanged
+        records = [
+            {
+                **record,
+                "request_timestamp": datetime.utcfromtimestamp(
+                    record["request_timestamp"] / 1000
+                ).isoformat()
             }
-            
-            # In Part 5, we'll create the actual endpoint
-            # For now, we'll use a placeholder endpoint
+            for record in batch
+        ]
+        
+        try:
             response = await self.client.post(
-                "/api/v1/requests/log",
-                json=request_data,
+                "/api/v1/requests/log_batch",
+                json={"records": records},
                 timeout=5.0
             )
             
             if response.status_code in [200, 201]:
-                logger.debug(f"Logged request: {content_id} at {edge_id} (hit={is_cache_hit})")
+                logger.debug("Logged batch of %s requests", len(batch))
                 return True
             else:
-                logger.warning(f"Failed to log request: {response.status_code}")
+                logger.warning(f"Failed to log request batch: {response.status_code}")
                 return False
         except httpx.TimeoutException:
-            logger.warning(f"Timeout logging request for {content_id}")
+            logger.warning(f"Timeout logging batch of {len(batch)} requests")
             return False
         except httpx.RequestError as e:
             logger.warning(f"Request error logging metrics: {e}")
@@ -84,6 +146,29 @@ class MetricsLogger:
             logger.error(f"Unexpected error logging metrics: {e}")
             return False
     
+    async def _flush(self):
+        """Send everything currently queued"""
+        while not self._queue.empty():
+            self._pending = self._take_batch()
+            await self._send_batch(self._pending)
+            self._pending = []
+    
+    async def _flusher(self):
+        """Background loop flushing queued records every flush_interval"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+    
     async def close(self):
-        """Close HTTP client"""
+        """Stop the flusher, send remaining records and close HTTP client"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # A batch whose send was cancelled has already left the queue
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._send_batch(batch)
+        await self._flush()
         await self.client.aclose()
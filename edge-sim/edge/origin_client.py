@@ -3,34 +3,59 @@ Origin Server Client
 Fetches content from backend origin server
 """
 import httpx
+import orjson
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from edge.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def parse_content(body: bytes) -> Dict[str, Any]:
+    """
+    Extract the content item from a raw origin response body.
+    
+    Args:
+        body: JSON body returned by the origin content endpoint
+    
+    Returns:
+        Content data
+    """
+    return orjson.loads(body).get("data", {})
+
+
 class OriginClient:
     """Client for fetching content from origin server"""
     
     def __init__(self):
         """Initialize origin client"""
         self.base_url = settings.ORIGIN_SERVER_URL
+        # One multiplexed HTTP/2 pool shared by all origin fetches
         self.client = httpx.AsyncClient(
             base_url=self.base_url,
-            timeout=30.0
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=3.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=100,
+                keepalive_expiry=60.0
+            )
         )
     
-    async def fetch_content(self, content_id: str) -> Optional[Dict[str, Any]]:
+    async def fetch_content(self, content_id: str) -> Optional[Tuple[bytes, int]]:
         """
         Fetch content from origin server.
         
+        The body is returned unparsed so it can be cached verbatim;
+        use parse_content() when the content fields are needed.
+        
         Args:
             content_id: Content identifier
         
         Returns:
-            Content data if found, None otherwise
+            Tuple of (raw response body, fetch time in ms) if found, None otherwise
         """
         try:
             start_time = time.time()
@@ -42,14 +67,8 @@ class OriginClient:
             elapsed_ms = int((time.time() - start_time) * 1000)
             
             if response.status_code == 200:
-                data = response.json()
-                content_data = data.get("data", {})
                 logger.info(f"Fetched {content_id} from origin in {elapsed_ms}ms")
-                return {
-                    **content_data,
-                    "_origin_fetch_time_ms": elapsed_ms,
-                    "_fetched_at": time.time()
-                }
+                return response.content, elapsed_ms
             elif response.status_code == 404:
                 logger.warning(f"Content {content_id} not found at origin")
                 return None
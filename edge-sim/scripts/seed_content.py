@@ -9,6 +9,9 @@ from typing import List, Dict
 
 BACKEND_URL = "http://localhost:8000"
 
+# Maximum concurrent create requests
+MAX_CONCURRENCY = 32
+
 # Sample content to create
 SAMPLE_CONTENT = [
     {"content_id": "video-001", "content_type": "video", "size_kb": 5000, "category": "entertainment"},
@@ -23,16 +26,17 @@ SAMPLE_CONTENT = [
 ]
 
 
-async def create_content(content: Dict, client: httpx.AsyncClient) -> bool:
+async def create_content(content: Dict, client: httpx.AsyncClient, sem: asyncio.Semaphore) -> bool:
     """Create a single content item"""
     try:
         # Note: This endpoint will be created in Part 5
         # For now, we'll insert directly into database or use a placeholder
-        response = await client.post(
-            f"{BACKEND_URL}/api/v1/content",
-            json=content,
-            timeout=5.0
-        )
+        async with sem:
+            response = await client.post(
+                f"{BACKEND_URL}/api/v1/content",
+                json=content,
+                timeout=5.0
+            )
         
         if response.status_code in [200, 201]:
             print(f"✓ Created {content['content_id']}")
@@ -51,24 +55,29 @@ async def seed_content():
     print(f"Backend URL: {BACKEND_URL}")
     print()
     
-    client = httpx.AsyncClient()
+    client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=64)
+    )
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
     
-    success_count = 0
+    # Add sample data
+    items = [
+        {
+            **content,
+            "data": {
+                "title": f"Sample {content['content_type']} content",
+                "description": f"This is sample {content['content_type']} content",
+                "url": f"https://example.com/{content['content_id']}"
+            }
+        }
+        for content in SAMPLE_CONTENT
+    ]
     
     try:
-        for content in SAMPLE_CONTENT:
-            # Add sample data
-            content_data = {
-                **content,
-                "data": {
-                    "title": f"Sample {content['content_type']} content",
-                    "description": f"This is sample {content['content_type']} content",
-                    "url": f"https://example.com/{content['content_id']}"
-                }
-            }
-            
-            if await create_content(content_data, client):
-                success_count += 1
+        # Create all items concurrently, bounded by the semaphore
+        results = await asyncio.gather(*(create_content(item, client, sem) for item in items))
+        success_count = sum(results)
         
         print()
         print(f"Successfully created {success_count}/{len(SAMPLE_CONTENT)} content items")
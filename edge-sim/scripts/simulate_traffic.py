@@ -3,11 +3,12 @@ Traffic Simulation Script
 Generates requests to edge simulator to test cache behavior
 """
 import asyncio
-import httpx
+import aiohttp
+import numpy as np
 import random
 import time
 import argparse
-from typing import List
+from typing import List, Optional, Tuple
 
 # Edge simulator URL
 EDGE_SIM_URL = "http://localhost:8002"
@@ -20,44 +21,101 @@ DEFAULT_CONTENT_IDS = [
 # Edge IDs
 EDGE_IDS = ["edge-us-east", "edge-us-west", "edge-eu-west"]
 
+# Prebuilt request URL prefix and per-edge headers (extended on first use of a custom edge ID)
+URL_TMPL = EDGE_SIM_URL + "/api/v1/content/"
+HEADERS_BY_EDGE = {edge_id: {"X-Edge-Id": edge_id} for edge_id in EDGE_IDS}
+
+# Module-level generator for per-run edge sampling
+_rng = random.Random()
+
+# Seconds between progress reports
+PROGRESS_INTERVAL_S = 1.0
+
+# Smoothing factor of the running hit-rate EWMA (TCP RTT estimator convention)
+HIT_RATE_EWMA_ALPHA = 0.125
+
+# Zipf skew of content popularity (content_ids are ordered most to least popular)
+ZIPF_ALPHA = 1.0
+
+
+def zipf_trace(n_items: int, size: int, alpha: float = ZIPF_ALPHA, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Pre-generate a request trace over popularity-ranked items.
+    
+    Args:
+        n_items: Number of distinct items (rank 0 is the most popular)
+        size: Number of requests in the trace
+        alpha: Zipf exponent
+        seed: Random seed for a reproducible trace
+    
+    Returns:
+        Array of item indices, one per request
+    """
+    ranks = np.arange(1, n_items + 1, dtype=np.float64)
+    weights = ranks ** -alpha
+    rng = np.random.default_rng(seed)
+    return rng.choice(n_items, size=size, p=weights / weights.sum()).astype(np.int32)
+
+
+def create_client() -> aiohttp.ClientSession:
+    """
+    Create an HTTP session whose connector is sized for high-concurrency runs.
+    Must be called from a running event loop.
+    """
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=10, connect=5),
+        connector=aiohttp.TCPConnector(
+            limit=1000,
+            limit_per_host=200,
+            ttl_dns_cache=600,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+    )
+
 
 async def make_request(
-    client: httpx.AsyncClient,
+    client: aiohttp.ClientSession,
     content_id: str,
     edge_id: str,
     verbose: bool = False
 ) -> dict:
     """Make a single request to edge simulator"""
+    headers = HEADERS_BY_EDGE.get(edge_id)
+    if headers is None:
+        headers = HEADERS_BY_EDGE[edge_id] = {"X-Edge-Id": edge_id}
+    
     try:
-        start_time = time.time()
-        response = await client.get(
-            f"{EDGE_SIM_URL}/api/v1/content/{content_id}",
-            headers={"X-Edge-Id": edge_id},
-            timeout=10.0
-        )
-        elapsed = (time.time() - start_time) * 1000
+        # Client-side round-trip time is only reported in verbose mode
+        if verbose:
+            start_ns = time.perf_counter_ns()
+        # Cache status comes from response headers; the body is never read or parsed
+        async with client.get(URL_TMPL + str(content_id), headers=headers) as response:
+            status_code = response.status
+            response_headers = response.headers
+        if verbose:
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             result = {
                 "content_id": content_id,
                 "edge_id": edge_id,
-                "cache_hit": data.get("is_cache_hit", False),
-                "response_time_ms": data.get("response_time_ms", 0),
+                "cache_hit": response_headers.get("X-Cache-Hit") == "1",
+                "response_time_ms": int(response_headers.get("X-Response-Time-Ms", "0")),
                 "status": "success"
             }
             if verbose:
-                print(f"✓ {content_id} @ {edge_id}: {'HIT' if result['cache_hit'] else 'MISS'} ({result['response_time_ms']}ms)")
+                print(f"✓ {content_id} @ {edge_id}: {'HIT' if result['cache_hit'] else 'MISS'} ({result['response_time_ms']}ms, RTT {elapsed_ms:.1f}ms)")
             return result
         else:
             result = {
                 "content_id": content_id,
                 "edge_id": edge_id,
                 "status": "error",
-                "status_code": response.status_code
+                "status_code": status_code
             }
             if verbose:
-                print(f"✗ {content_id} @ {edge_id}: Error {response.status_code}")
+                print(f"✗ {content_id} @ {edge_id}: Error {status_code}")
             return result
     except Exception as e:
         result = {
@@ -71,22 +129,73 @@ async def make_request(
         return result
 
 
+async def _progress_printer(counter: dict, total: int, interval: float = PROGRESS_INTERVAL_S):
+    """Print aggregate progress every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        print(
+            f"Progress: {counter['done']}/{total} requests "
+            f"(hits: {counter['hits']}, misses: {counter['misses']}, errors: {counter['errors']}, "
+            f"hit rate EWMA: {counter['hit_ewma']*100:.1f}%)"
+        )
+
+
+def _print_summary(title: str, arr: np.ndarray, hit_ewma: float):
+    """Print hit/miss/error counts and response-time stats for an array of (hit, rt_ms, error) rows"""
+    total = len(arr)
+    ok = arr[:, 2] == 0
+    rt = arr[:, 1]
+    hits = int(arr[:, 0].sum())
+    errors = int(arr[:, 2].sum())
+    successes = total - errors
+    misses = successes - hits
+    
+    print()
+    print("=" * 50)
+    print(title)
+    print("=" * 50)
+    print(f"Total requests: {total}")
+    if total > 0:
+        print(f"Cache hits: {hits} ({hits/total*100:.1f}%)")
+        print(f"Cache misses: {misses} ({misses/total*100:.1f}%)")
+    print(f"Errors: {errors}")
+    if successes > 0:
+        ok_rt = rt[ok]
+        p50, p95, p99 = np.percentile(ok_rt, [50, 95, 99])
+        print(f"Hit rate: {hits/successes*100:.1f}% of successful requests")
+        print(f"Final hit rate EWMA: {hit_ewma*100:.1f}%")
+        print(f"Average response time: {ok_rt.mean():.2f}ms")
+        print(f"Response time p50/p95/p99: {p50:.0f}/{p95:.0f}/{p99:.0f}ms")
+    print("=" * 50)
+
+
 async def simulate_traffic(
     num_requests: int = 100,
     content_ids: List[str] = None,
     edge_ids: List[str] = None,
     delay_ms: int = 100,
-    verbose: bool = False
+    verbose: bool = False,
+    concurrency: int = 1,
+    client: Optional[aiohttp.ClientSession] = None,
+    zipf_alpha: float = ZIPF_ALPHA,
+    seed: Optional[int] = None,
+    warmup_requests: int = 0
 ):
     """
     Simulate CDN traffic.
     
     Args:
-        num_requests: Number of requests to make
+        num_requests: Number of requests to make (measured)
         content_ids: List of content IDs (defaults to DEFAULT_CONTENT_IDS)
         edge_ids: List of edge IDs (defaults to EDGE_IDS)
-        delay_ms: Delay between requests in milliseconds
+        delay_ms: Delay between requests per concurrent worker in milliseconds
         verbose: Print each request result
+        concurrency: Maximum number of requests in flight
+        client: HTTP session to reuse across runs (a new one is created and closed if None)
+        zipf_alpha: Zipf skew of content popularity
+        seed: Random seed for reproducible content and edge traces
+        warmup_requests: Requests made first to fill the cache; reported separately
+            and excluded from the measurement
     """
     if content_ids is None:
         content_ids = DEFAULT_CONTENT_IDS
@@ -95,74 +204,135 @@ async def simulate_traffic(
     
     print(f"Starting traffic simulation:")
     print(f"  Requests: {num_requests}")
+    if warmup_requests:
+        print(f"  Warmup requests: {warmup_requests}")
     print(f"  Content IDs: {len(content_ids)}")
     print(f"  Edge IDs: {len(edge_ids)}")
     print(f"  Delay: {delay_ms}ms between requests")
+    print(f"  Concurrency: {concurrency}")
+    print(f"  Zipf alpha: {zipf_alpha}" + (f" (seed {seed})" if seed is not None else ""))
     print()
     
-    client = httpx.AsyncClient()
+    owns_client = client is None
+    if owns_client:
+        client = create_client()
+    sem = asyncio.Semaphore(concurrency)
+    counter = {}
+    progress_task = None
+    
+    # Content popularity follows a Zipf distribution; both sequences are drawn once for the whole run
+    total_requests = warmup_requests + num_requests
+    trace = zipf_trace(len(content_ids), total_requests, alpha=zipf_alpha, seed=seed)
+    edge_rng = random.Random(seed) if seed is not None else _rng
+    edge_trace = edge_rng.choices(edge_ids, k=total_requests)
     
-    hits = 0
-    misses = 0
-    errors = 0
-    total_response_time = 0
+    # Request i of a phase is scheduled at a fixed offset from the phase start, so each of the
+    # concurrent workers keeps delay_ms between requests and waiting overlaps in-flight requests
+    loop = asyncio.get_running_loop()
+    dispatch_interval = (delay_ms / 1000.0) / concurrency
+    
+    async def _run(i: int, send_at: float) -> Tuple[int, int, int]:
+        """Make request i at loop time send_at and return its (hit_bit, response_time_ms, error_bit)"""
+        await asyncio.sleep(max(0.0, send_at - loop.time()))
+        async with sem:
+            result = await make_request(client, content_ids[trace[i]], edge_trace[i], verbose)
+        
+        # Live progress counters, reported by the background printer
+        counter["done"] += 1
+        if result.get("status") != "success":
+            counter["errors"] += 1
+            return 0, 0, 1
+        is_hit = int(bool(result.get("cache_hit")))
+        if is_hit:
+            counter["hits"] += 1
+        else:
+            counter["misses"] += 1
+        # Recent hit rate, so transient cache behavior shows up in progress reports;
+        # seeded with the first sample so early values aren't biased toward 0%
+        if counter["hits"] + counter["misses"] == 1:
+            counter["hit_ewma"] = float(is_hit)
+        else:
+            counter["hit_ewma"] += HIT_RATE_EWMA_ALPHA * (is_hit - counter["hit_ewma"])
+        return is_hit, result.get("response_time_ms", 0), 0
+    
+    async def _run_phase(first: int, n: int) -> np.ndarray:
+        """Run requests first..first+n-1 with fresh counters; returns their (hit, rt_ms, error) rows"""
+        nonlocal progress_task
+        counter.update(done=0, hits=0, misses=0, errors=0, hit_ewma=0.0)
+        if not verbose:
+            progress_task = asyncio.create_task(_progress_printer(counter, n))
+        
+        start_time = loop.time()
+        tasks = [
+            asyncio.create_task(_run(first + j, start_time + j * dispatch_interval))
+            for j in range(n)
+        ]
+        results = await asyncio.gather(*tasks)
+        if progress_task:
+            progress_task.cancel()
+        
+        # Aggregate the (hit, response time, error) tuples with vectorized NumPy ops
+        return np.array(results, dtype=np.int32).reshape(-1, 3)
     
     try:
-        for i in range(num_requests):
-            content_id = random.choice(content_ids)
-            edge_id = random.choice(edge_ids)
-            
-            result = await make_request(client, content_id, edge_id, verbose)
-            
-            if result.get("status") == "success":
-                if result.get("cache_hit"):
-                    hits += 1
-                else:
-                    misses += 1
-                total_response_time += result.get("response_time_ms", 0)
-            else:
-                errors += 1
-            
-            # Delay between requests
-            if delay_ms > 0 and i < num_requests - 1:
-                await asyncio.sleep(delay_ms / 1000.0)
-            
-            # Progress update
-            if not verbose and (i + 1) % 10 == 0:
-                print(f"Progress: {i + 1}/{num_requests} requests")
+        if warmup_requests:
+            print("Warming up cache...")
+            warmup = await _run_phase(0, warmup_requests)
+            warmup_ewma = counter["hit_ewma"]
+            print("Warmup complete, starting measurement")
+        
+        measured = await _run_phase(warmup_requests, num_requests)
         
-        # Print summary
-        print()
-        print("=" * 50)
-        print("Simulation Summary")
-        print("=" * 50)
-        print(f"Total requests: {num_requests}")
-        print(f"Cache hits: {hits} ({hits/num_requests*100:.1f}%)")
-        print(f"Cache misses: {misses} ({misses/num_requests*100:.1f}%)")
-        print(f"Errors: {errors}")
-        if hits + misses > 0:
-            avg_response_time = total_response_time / (hits + misses)
-            print(f"Average response time: {avg_response_time:.2f}ms")
-        print("=" * 50)
+        if warmup_requests:
+            _print_summary("Warmup Summary", warmup, warmup_ewma)
+            _print_summary("Measurement Summary", measured, counter["hit_ewma"])
+        else:
+            _print_summary("Simulation Summary", measured, counter["hit_ewma"])
         
     finally:
-        await client.aclose()
+        if progress_task:
+            progress_task.cancel()
+        if owns_client:
+            await client.close()
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for integers >= 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Simulate CDN traffic")
     parser.add_argument("-n", "--num-requests", type=int, default=100, help="Number of requests")
-    parser.add_argument("-d", "--delay", type=int, default=100, help="Delay between requests (ms)")
+    parser.add_argument("-d", "--delay", type=int, default=100, help="Delay between requests per worker (ms)")
+    parser.add_argument("-c", "--concurrency", type=_positive_int, default=1, help="Maximum requests in flight")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
     parser.add_argument("--content-ids", nargs="+", help="Content IDs to request")
     parser.add_argument("--edge-ids", nargs="+", help="Edge IDs to use")
+    parser.add_argument("--zipf-alpha", type=float, default=ZIPF_ALPHA, help="Zipf skew of content popularity")
+    parser.add_argument("--seed", type=int, help="Random seed for a reproducible request trace")
+    parser.add_argument("--warmup", type=int, default=0, help="Cache warmup requests made before measurement")
     
     args = parser.parse_args()
     
+    # Use the libuv-based event loop when available (not on Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(simulate_traffic(
         num_requests=args.num_requests,
         content_ids=args.content_ids,
         edge_ids=args.edge_ids,
         delay_ms=args.delay,
-        verbose=args.verbose
+        verbose=args.verbose,
+        concurrency=args.concurrency,
+        zipf_alpha=args.zipf_alpha,
+        seed=args.seed,
+        warmup_requests=args.warmup
     ))
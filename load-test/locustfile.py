@@ -1,173 +1,141 @@
 """
 Locust Load Test for Smart CDN
 Simulates user traffic to test AI-enabled vs baseline caching performance
+
+Each Locust process uses a single core; run with one worker per core:
+    locust -f locustfile.py --processes=-1
+locust.conf in this directory sets this by default; locust.headless.conf adds a headless 500-user run.
 """
-from locust import HttpUser, task, between
+from locust import FastHttpUser, between
+import itertools
+import numpy as np
+import os
 import random
 import json
 
+# Load profile to run (see UnifiedCDNUser)
+LOAD_PROFILE = os.environ.get("LOAD_PROFILE", "normal")
+
+# Zipf skew of content popularity (content IDs are ordered most to least popular)
+ZIPF_ALPHA = 1.0
+# Requests pre-generated per user before the sequence wraps around
+TRACE_LENGTH = 10_000
+
+
+def zipf_trace(n_items: int, rng: np.random.Generator, size: int = TRACE_LENGTH, alpha: float = ZIPF_ALPHA) -> np.ndarray:
+    """Pre-generate item indices (rank 0 most popular) drawn from a Zipf distribution"""
+    ranks = np.arange(1, n_items + 1, dtype=np.float64)
+    weights = ranks ** -alpha
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
 
-class CDNUser(HttpUser):
+class UnifiedCDNUser(FastHttpUser):
     """
-    Simulates a user browsing content through the CDN.
+    Simulates CDN users for every load profile.
+    
+    The profile is chosen at import time with the LOAD_PROFILE environment variable:
+      normal - requests through the edge simulator plus occasional AI decisions (default)
+      full   - mixed, popular and rare content requests through the full CDN stack
+      spike  - repeated requests for a single viral content item
     """
-    wait_time = between(1, 3)  # Wait 1-3 seconds between requests
+    network_timeout = 10.0
+    connection_timeout = 5.0
+    
+    # Shared, immutable ID data; CONTENT_IDS is ordered most to least popular
+    EDGES = ("edge-us-east-1", "edge-us-west-1", "edge-eu-west-1")
+    CONTENT_IDS = tuple(range(1, 11))
+    
+    # Content ID pools per task
+    _POOLS = {
+        "all": CONTENT_IDS,
+        "popular": (1, 2, 3),
+        "rare": (8, 9, 10),
+        "viral": (1,)
+    }
+    
+    # Request paths for every (edge, content) pair, built once so tasks do no string formatting
+    _urls = {
+        (edge_id, content_id): f"/edge/{edge_id}/content/{content_id}"
+        for edge_id, content_id in itertools.product(EDGES, CONTENT_IDS)
+    }
     
     def on_start(self):
         """Called when a user starts"""
-        # Get list of available edges and content
-        self.edges = ["edge-us-east-1", "edge-us-west-1", "edge-eu-west-1"]
-        self.content_ids = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]  # Common content IDs
+        # Draw this user's edge and (Zipf) content sequences in one batch; tasks only bump _i.
+        # Converted to lists so indexing yields plain ints rather than NumPy scalars
+        rng = np.random.default_rng()
+        self._edge_idx = rng.integers(0, len(self.EDGES), size=TRACE_LENGTH).tolist()
+        self._content_idx = zipf_trace(len(self.CONTENT_IDS), rng).tolist()
+        self._i = 0
+    
+    def _get_content(self, name, content_id=None, not_found_ok=False):
+        """Request content from the next edge node in the sequence (content_id defaults to the Zipf trace)"""
+        i = self._i
+        self._i = (i + 1) % TRACE_LENGTH
+        edge_id = self.EDGES[self._edge_idx[i]]
+        if content_id is None:
+            content_id = self.CONTENT_IDS[self._content_idx[i]]
+        
+        url = self._urls[(edge_id, content_id)]
+        if not not_found_ok:
+            # Locust reports non-2xx responses as failures by default
+            self.client.get(url, name=name)
+            return
         
-    @task(3)
+        with self.client.get(url, catch_response=True, name=name) as response:
+            if response.status_code in [200, 404]:
+                response.success()
+            else:
+                response.failure(f"Status: {response.status_code}")
+    
     def request_content(self):
         """
         Request content from an edge node (most common task).
         This simulates a cache hit or miss scenario.
         """
-        edge_id = random.choice(self.edges)
-        content_id = random.choice(self.content_ids)
-        
-        # Simulate request to edge simulator
-        # In a real scenario, this would go through the edge node
-        # For testing, we'll call the edge simulator directly
-        with self.client.get(
-            f"/edge/{edge_id}/content/{content_id}",
-            catch_response=True,
-            name="Request Content"
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            elif response.status_code == 404:
-                response.failure("Content not found")
-            else:
-                response.failure(f"Unexpected status: {response.status_code}")
+        self._get_content("Request Content")
     
-    @task(1)
     def request_popular_content(self):
         """
         Request popular content (higher probability of cache hit).
         """
-        edge_id = random.choice(self.edges)
-        # Popular content IDs (1-3)
-        content_id = random.choice([1, 2, 3])
-        
-        with self.client.get(
-            f"/edge/{edge_id}/content/{content_id}",
-            catch_response=True,
-            name="Request Popular Content"
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status: {response.status_code}")
+        self._get_content("Request Popular Content", random.choice(self._POOLS["popular"]))
     
-    @task(1)
     def request_rare_content(self):
         """
         Request rare content (higher probability of cache miss).
         """
-        edge_id = random.choice(self.edges)
-        # Rare content IDs (8-10)
-        content_id = random.choice([8, 9, 10])
-        
-        with self.client.get(
-            f"/edge/{edge_id}/content/{content_id}",
-            catch_response=True,
-            name="Request Rare Content"
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status: {response.status_code}")
-
-
-class EdgeSimulatorUser(HttpUser):
-    """
-    Simulates requests directly to the edge simulator API.
-    This is more realistic for testing the full CDN stack.
-    """
-    wait_time = between(0.5, 2)  # Faster requests for edge simulator
+        self._get_content("Request Rare Content", random.choice(self._POOLS["rare"]))
     
-    def on_start(self):
-        """Called when a user starts"""
-        self.edges = ["edge-us-east-1", "edge-us-west-1", "edge-eu-west-1"]
-        self.content_ids = list(range(1, 11))
-        
-    @task(5)
     def simulate_edge_request(self):
         """
         Simulate a request through the edge simulator.
         This will trigger cache lookup, origin fetch if needed, and metrics logging.
         """
-        edge_id = random.choice(self.edges)
-        content_id = random.choice(self.content_ids)
-        
-        # Request through edge simulator
-        with self.client.get(
-            f"/edge/{edge_id}/content/{content_id}",
-            catch_response=True,
-            name="Edge Request"
-        ) as response:
-            if response.status_code in [200, 404]:
-                response.success()
-            else:
-                response.failure(f"Status: {response.status_code}")
+        self._get_content("Edge Request", not_found_ok=True)
+    
+    def request_viral_content(self):
+        """
+        Request viral content repeatedly (simulates traffic spike).
+        """
+        self._get_content("Viral Content Request", self._POOLS["viral"][0])
     
-    @task(1)
     def trigger_ai_decisions(self):
         """
         Trigger AI decision generation (less frequent).
         """
-        with self.client.post(
+        self.client.post(
             "/api/v1/ai/decide",
             params={"time_window_minutes": 60, "apply_decisions": True},
-            catch_response=True,
             name="Trigger AI Decisions"
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status: {response.status_code}")
-
-
-class SpikeTestUser(HttpUser):
-    """
-    Simulates traffic spikes (viral content scenario).
-    Use this for spike testing.
-    """
-    wait_time = between(0.1, 0.5)  # Very fast requests during spike
+        )
     
-    def on_start(self):
-        """Called when a user starts"""
-        self.edges = ["edge-us-east-1", "edge-us-west-1", "edge-eu-west-1"]
-        # Viral content ID (most requested during spike)
-        self.viral_content_id = 1
-        
-    @task(10)
-    def request_viral_content(self):
-        """
-        Request viral content repeatedly (simulates traffic spike).
-        """
-        edge_id = random.choice(self.edges)
-        
-        with self.client.get(
-            f"/edge/{edge_id}/content/{self.viral_content_id}",
-            catch_response=True,
-            name="Viral Content Request"
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Status: {response.status_code}")
-
-
-# Configuration for different test scenarios
-class NormalLoadTest(EdgeSimulatorUser):
-    """Normal load test scenario"""
-    pass
-
-
-class SpikeLoadTest(SpikeTestUser):
-    """Spike load test scenario"""
-    pass
+    # Wait time and weighted tasks for each load profile
+    PROFILES = {
+        "normal": (between(0.5, 2), {simulate_edge_request: 5, trigger_ai_decisions: 1}),
+        "full": (between(1, 3), {request_content: 3, request_popular_content: 1, request_rare_content: 1}),
+        "spike": (between(0.1, 0.5), {request_viral_content: 10})
+    }
+    if LOAD_PROFILE not in PROFILES:
+        raise ValueError(f"Unknown LOAD_PROFILE {LOAD_PROFILE!r}, expected one of {sorted(PROFILES)}")
+    wait_time, tasks = PROFILES[LOAD_PROFILE]